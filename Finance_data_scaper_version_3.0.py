@@ -1,25 +1,22 @@
 import csv
 import os
 import time
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import argparse
 
+# selenium & pandas are imported inside the functions that drive the browser,
+# so --dry-run can validate the ticker CSV without loading them.
+
 # 🏗️ Add CLI argument parsing
 parser = argparse.ArgumentParser(description="Stock Analysis Data Scraper")
 parser.add_argument("--tickers", type=str, required=True, help="Path to the CSV file with tickers & URLs")
 parser.add_argument("--data-dir", type=str, default="financial_data", help="Path to store scraped financial data")
+parser.add_argument("--periods", type=str, default="annual", help="Comma-separated table views to capture: annual, quarterly, ttm (default: annual)")
+parser.add_argument("--dry-run", action="store_true", help="Validate the ticker CSV and print the pages that would be scraped, without opening a browser")
 args = parser.parse_args()
 
 # 📂 Set input and output directories
 INPUT_FILE = args.tickers
 OUTPUT_DIR = args.data_dir
-os.makedirs(OUTPUT_DIR, exist_ok=True)  # Ensure output directory exists
 
 print(f"📄 Using ticker file: {INPUT_FILE}")
 print(f"💾 Saving scraped data to: {OUTPUT_DIR}")
@@ -28,15 +25,33 @@ print(f"💾 Saving scraped data to: {OUTPUT_DIR}")
 GECKODRIVER_PATH = r"C:\Users\ccape\Downloads\geckodriver-v0.35.0-win32\geckodriver.exe"
 FIREFOX_BINARY_PATH = r"C:\Program Files\Mozilla Firefox\firefox.exe"
 
-# Define financial tabs
-TABS = {
-    "Balance Sheet": "//a[contains(text(), 'Balance Sheet')]",
-    "Cash Flow": "//a[contains(text(), 'Cash Flow')]",
-    "Ratios": "//a[contains(text(), 'Ratios')]"
+# Financial tables keyed by the file stem they are saved under (<TICKER>_<stem>.csv):
+# "tab" is the link text clicked in the annual view (None = shown on page load),
+# "path" is the table's URL relative to the ticker's /financials/ page.
+TABLES = {
+    "income_statement": {"tab": None, "path": ""},
+    "balance_sheet": {"tab": "Balance Sheet", "path": "balance-sheet/"},
+    "cash_flow": {"tab": "Cash Flow", "path": "cash-flow-statement/"},
+    "ratios": {"tab": "Ratios", "path": "ratios/"}
+}
+
+# Query parameter selecting each non-annual table view
+PERIOD_QUERIES = {
+    "quarterly": "?p=quarterly",
+    "ttm": "?p=trailing"
 }
 
+PERIODS = [period.strip().lower() for period in args.periods.split(",") if period.strip()]
+unknown_periods = [period for period in PERIODS if period != "annual" and period not in PERIOD_QUERIES]
+if unknown_periods:
+    parser.error(f"Unknown period(s): {', '.join(unknown_periods)}. Use annual, quarterly or ttm.")
+
 # Function to initialize WebDriver
 def init_driver():
+    from selenium import webdriver
+    from selenium.webdriver.firefox.service import Service
+    from selenium.webdriver.firefox.options import Options
+
     options = Options()
     options.binary_location = FIREFOX_BINARY_PATH
     service = Service(GECKODRIVER_PATH)
@@ -44,13 +59,18 @@ def init_driver():
     return driver
 
 # Function to extract table data
-def extract_table(driver, ticker, tab_name, output_dir):
-    """Extracts financial table data and saves it as a CSV."""
+def extract_table(driver, ticker, table_name, output_dir, period="annual"):
+    """Extracts financial table data and saves it as a CSV (non-annual views get a _<period> suffix)."""
+    import pandas as pd
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     try:
         table = WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.XPATH, "//table[@data-test='financials']"))
         )
-        print(f"✅ Table found for {ticker} - {tab_name}")
+        print(f"✅ Table found for {ticker} - {table_name} ({period})")
 
         # Extract rows
         rows = table.find_elements(By.XPATH, ".//tr")
@@ -63,26 +83,34 @@ def extract_table(driver, ticker, tab_name, output_dir):
         df = pd.DataFrame(table_data[1:], columns=table_data[0])
 
         # Save as CSV
-        filename = os.path.join(output_dir, f"{ticker}_{tab_name.replace(' ', '_').lower()}.csv")
+        suffix = "" if period == "annual" else f"_{period}"
+        filename = os.path.join(output_dir, f"{ticker}_{table_name}{suffix}.csv")
         df.to_csv(filename, index=False)
         print(f"💾 Saved: {filename}")
 
     except Exception as e:
-        print(f"❌ Failed to extract table for {ticker} - {tab_name}. Error: {e}")
+        print(f"❌ Failed to extract table for {ticker} - {table_name} ({period}). Error: {e}")
 
 # Function to scrape a company's financials (🔥 Re-added!)
 def scrape_financials(driver, url, ticker):
     """Scrapes financial tables for a given company."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     print(f"\n🌐 Scraping: {ticker} ({url})")
     driver.get(url)
     WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
     print(f"✅ Page loaded for {ticker}")
 
-    # Income Statement (default)
-    extract_table(driver, ticker, "income_statement", OUTPUT_DIR)
+    # Loop through tables, clicking each tab (the default one is already shown)
+    for table_name, table in TABLES.items():
+        tab_name = table["tab"]
+        if tab_name is None:
+            extract_table(driver, ticker, table_name, OUTPUT_DIR)
+            continue
 
-    # Loop through tabs
-    for tab_name, tab_xpath in TABS.items():
+        tab_xpath = f"//a[contains(text(), '{tab_name}')]"
         print(f"📊 Navigating to {tab_name} for {ticker}...")
         try:
             tab_element = WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.XPATH, tab_xpath)))
@@ -102,7 +130,29 @@ def scrape_financials(driver, url, ticker):
                 continue
 
         time.sleep(2)
-        extract_table(driver, ticker, tab_name, OUTPUT_DIR)
+        extract_table(driver, ticker, table_name, OUTPUT_DIR)
+
+# Function to scrape the quarterly / TTM views of a company's financials
+def scrape_period_financials(driver, url, ticker, period):
+    """Loads each financial table directly by URL in the requested period view."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    base_url = url if url.endswith("/") else url + "/"
+
+    for table_name, table in TABLES.items():
+        period_url = f"{base_url}{table['path']}{PERIOD_QUERIES[period]}"
+        print(f"📊 Loading {period} {table_name} for {ticker}: {period_url}")
+        try:
+            driver.get(period_url)
+            WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        except Exception as e:
+            print(f"❌ Could not load {period} {table_name} for {ticker}. Skipping. Error: {e}")
+            continue
+
+        time.sleep(2)
+        extract_table(driver, ticker, table_name, OUTPUT_DIR, period)
 
 # Function to read tickers from CSV
 def load_tickers_from_csv(filename):
@@ -133,11 +183,22 @@ def main():
         print("❌ No valid tickers to process. Exiting...")
         return
 
+    if args.dry_run:
+        print(f"🧪 Dry run: {len(companies)} valid tickers, periods: {', '.join(PERIODS)}")
+        for ticker, url in companies.items():
+            print(f"  {ticker}: {url}")
+        return
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)  # Ensure output directory exists
     driver = init_driver()
 
     try:
         for ticker, url in companies.items():
-            scrape_financials(driver, url, ticker)
+            if "annual" in PERIODS:
+                scrape_financials(driver, url, ticker)
+            for period in PERIODS:
+                if period != "annual":
+                    scrape_period_financials(driver, url, ticker, period)
     finally:
         driver.quit()
         print("\n🚪 Browser closed. All scraping completed!")
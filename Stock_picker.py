@@ -1,6 +1,8 @@
 import os
+import csv
 import argparse
-import pandas as pd
+from dependency_tracker import find_changed, record_stage
+from screening_rules import load_rule_sets, classify_universe
 
 # Parse CLI arguments
 parser = argparse.ArgumentParser(description="Stock Picker: Analyze and classify financial data.")
@@ -16,22 +18,129 @@ parser.add_argument(
     required=True, 
     help="Comma-separated list of tickers to process (e.g., 'GM,TSLA,AAPL')."
 )
+parser.add_argument(
+    "--force",
+    action="store_true",
+    help="Recompute every ticker, even if its source tables are unchanged."
+)
+parser.add_argument(
+    "--rules",
+    type=str,
+    default=None,
+    help="Path to a JSON file of named screening rule sets (default: built-in Strong/Medium/Weak thresholds)."
+)
+parser.add_argument(
+    "--sectors",
+    type=str,
+    default=None,
+    help="Path to a CSV with 'ticker' and 'sector' columns (e.g. tickers.csv); adds a Sector column for rules grouped by sector."
+)
+parser.add_argument(
+    "--dry-run",
+    action="store_true",
+    help="Validate inputs and report which tickers would be recomputed, without loading pandas or writing results."
+)
 args = parser.parse_args()
 
 # Set directory path and tickers
 data_dir = args.data_dir
 tickers = args.tickers.split(",")  # Convert comma-separated string into a list
+output_file = os.path.join(data_dir, "financial_classification_results.csv")
 
-# Function to load and merge financial data for a ticker
-def load_ticker_data(ticker):
-    """Loads and merges financial data CSVs for a given ticker."""
-    files = {
+# A missing or malformed rule file fails fast, before any scoring (and in --dry-run)
+try:
+    rule_sets = load_rule_sets(args.rules)
+except (OSError, ValueError) as e:
+    print(f"❌ Invalid rules file {args.rules}: {e}")
+    exit(1)
+
+def load_sectors(filename):
+    """Reads the optional ticker -> sector mapping (blank sectors are skipped)."""
+    sectors = {}
+    with open(filename, mode="r", newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            ticker = (row.get("ticker") or "").strip().upper()
+            sector = (row.get("sector") or "").strip()
+            if ticker and sector:
+                sectors[ticker] = sector
+    return sectors
+
+sectors = {}
+if args.sectors:
+    if not os.path.exists(args.sectors):
+        print(f"❌ Sector file not found: {args.sectors}")
+        exit(1)
+    sectors = load_sectors(args.sectors)
+
+# Scoring logic version, part of the dependency digest: bump whenever the scores
+# computed below change, so cached results are recomputed.
+# 2: per-row Stock_Valuation, Ticker pseudo-row excluded from reshaped periods
+STAGE_VERSION = 2
+
+# Per-ticker scores kept between runs; classifications are re-derived from them every run
+SCORE_COLUMNS = ["Ticker", "Piotroski_F", "Stock_Valuation"]
+
+def ticker_source_files(ticker):
+    """Returns the source CSV paths for a given ticker."""
+    return {
         "ratios": f"{data_dir}/{ticker}_ratios.csv",
         "cash_flow": f"{data_dir}/{ticker}_cash_flow.csv",
         "balance_sheet": f"{data_dir}/{ticker}_balance_sheet.csv",
         "income_statement": f"{data_dir}/{ticker}_income_statement.csv",
     }
-    
+
+# Only recompute tickers whose source tables changed since the last run
+changed_tickers, input_digests = find_changed(
+    data_dir,
+    "stock_picker",
+    {ticker: list(ticker_source_files(ticker).values()) for ticker in tickers},
+    {ticker: [output_file] for ticker in tickers},
+    force=args.force,
+    version=STAGE_VERSION,
+)
+
+# Dry run: validation only, exits before any heavy dependency is imported
+if args.dry_run:
+    if not os.path.isdir(data_dir):
+        print(f"❌ Data directory not found: {data_dir}")
+        exit(1)
+
+    for ticker in tickers:
+        missing = [path for path in ticker_source_files(ticker).values() if not os.path.exists(path)]
+        if missing:
+            print(f"⚠️ {ticker}: missing {len(missing)} source file(s): {', '.join(missing)}")
+
+    # Tickers not yet in the results file are always recomputed
+    known_tickers = set()
+    if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
+        with open(output_file, mode="r", newline="", encoding="utf-8") as file:
+            known_tickers = {row.get("Ticker") for row in csv.DictReader(file)}
+    changed_tickers = [t for t in tickers if t in changed_tickers or t not in known_tickers]
+
+    print(f"✅ Rule sets OK: {', '.join(rule_sets)}")
+    if args.sectors:
+        unmapped = [t for t in tickers if t not in sectors]
+        print(f"✅ Sectors loaded for {len(tickers) - len(unmapped)} of {len(tickers)} tickers" + (f" (missing: {','.join(unmapped)})" if unmapped else ""))
+    print(f"🔁 Would recompute {len(changed_tickers)} of {len(tickers)} tickers: {','.join(changed_tickers) or 'none'}")
+    exit()
+
+import pandas as pd  # Loaded only once real work starts, so --dry-run stays fast
+
+existing_results = None
+if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
+    existing_results = pd.read_csv(output_file)
+    existing_results = existing_results[[c for c in SCORE_COLUMNS if c in existing_results.columns]]
+    # Only the requested universe is kept, so ranks/percentiles never depend on earlier runs
+    existing_results = existing_results[existing_results["Ticker"].isin(tickers)]
+    # Tickers missing from the existing results are recomputed even if their hash matches
+    known_tickers = set(existing_results["Ticker"])
+    changed_tickers = [t for t in tickers if t in changed_tickers or t not in known_tickers]
+
+# Function to load and merge financial data for a ticker
+def load_ticker_data(ticker):
+    """Loads and merges financial data CSVs for a given ticker."""
+    files = ticker_source_files(ticker)
+
     dataframes = {}
     for key, file_path in files.items():
         if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
@@ -50,28 +159,12 @@ def load_ticker_data(ticker):
 def reshape_data(df, ticker):
     """Converts 'Fiscal Year' row values into column headers and ensures the Ticker column is aligned."""
     df = df.set_index("Fiscal Year").T  # Transpose the dataset
+    df = df.drop(index="Ticker", errors="ignore")  # The ticker column is not a reporting period
     df = df.rename_axis("Date").reset_index()  # Reset index
     df["Ticker"] = ticker  # Add the ticker column to every row
     df = df.loc[:, ~df.columns.duplicated()]  # Remove duplicate columns
     return df
 
-# Load and reshape data for all tickers
-all_ticker_data = []
-for ticker in tickers:
-    raw_data = load_ticker_data(ticker)
-    if raw_data is not None:
-        reshaped_data = reshape_data(raw_data, ticker)
-        all_ticker_data.append(reshaped_data)
-
-if all_ticker_data:
-    all_tickers_df = pd.concat(all_ticker_data, ignore_index=True)
-else:
-    print("Error: No valid financial data found. Check your CSV files.")
-    exit()
-
-# Debugging: Print available columns
-print("Available Columns in DataFrame:", all_tickers_df.columns.tolist())
-
 # Ensure numeric conversion
 def ensure_numeric(df, columns):
     """Converts specified columns to numeric, handling errors."""
@@ -111,48 +204,76 @@ def compute_financial_metrics(df):
         # Ensure numeric conversion for all relevant valuation metrics
         recent_data = ensure_numeric(df, valuation_cols)
 
-        # Check the first column of the ratios table
-        metrics["Stock_Valuation"] = recent_data[valuation_cols].iloc[0].mean()
+        # Average the valuation ratios per row so each ticker/year is scored from its own data
+        metrics["Stock_Valuation"] = recent_data[valuation_cols].mean(axis=1)
     except Exception as e:
         print(f"Error in Stock Valuation calculation: {e}")
         metrics["Stock_Valuation"] = 0
 
     return pd.DataFrame(metrics)
 
-# Apply metrics calculation
-all_tickers_metrics = compute_financial_metrics(all_tickers_df)
+def compute_ticker_scores(tickers_to_compute):
+    """Loads, reshapes and scores the given tickers. Returns one row per ticker, or None if no data was found."""
+    all_ticker_data = []
+    for ticker in tickers_to_compute:
+        raw_data = load_ticker_data(ticker)
+        if raw_data is not None:
+            reshaped_data = reshape_data(raw_data, ticker)
+            all_ticker_data.append(reshaped_data)
+
+    if not all_ticker_data:
+        return None
+
+    all_tickers_df = pd.concat(all_ticker_data, ignore_index=True)
+
+    # Debugging: Print available columns
+    print("Available Columns in DataFrame:", all_tickers_df.columns.tolist())
+
+    # Apply metrics calculation
+    all_tickers_metrics = compute_financial_metrics(all_tickers_df)
 
-# Concatenate metrics with the original DataFrame
-all_tickers_df = pd.concat([all_tickers_df, all_tickers_metrics], axis=1)
+    # Concatenate metrics with the original DataFrame
+    all_tickers_df = pd.concat([all_tickers_df, all_tickers_metrics], axis=1)
 
-# Group data by ticker to calculate averages for Piotroski F-Score
-average_f_scores = all_tickers_df.groupby("Ticker", as_index=False)["Piotroski_F"].mean()
+    # Group data by ticker to calculate averages for Piotroski F-Score
+    average_f_scores = all_tickers_df.groupby("Ticker", as_index=False)["Piotroski_F"].mean()
 
-# Keep only Stock Valuation for the most recent year
-recent_valuations = all_tickers_df.sort_values("Date").drop_duplicates(subset="Ticker", keep="last")[["Ticker", "Stock_Valuation"]]
+    # Keep only Stock Valuation for the most recent year
+    recent_valuations = all_tickers_df.sort_values("Date").drop_duplicates(subset="Ticker", keep="last")[["Ticker", "Stock_Valuation"]]
 
-# Merge the averaged F-Score and recent valuation
-aggregated_df = pd.merge(average_f_scores, recent_valuations, on="Ticker")
+    # Merge the averaged F-Score and recent valuation
+    return pd.merge(average_f_scores, recent_valuations, on="Ticker")
 
-# Classification
-def classify_company(row):
-    f_score = row.get("Piotroski_F", None)
-    valuation = row.get("Stock_Valuation", None)
+# Only score tickers whose source tables changed
+if changed_tickers:
+    print(f"🔁 Recomputing {len(changed_tickers)} of {len(tickers)} tickers: {','.join(changed_tickers)}")
+    aggregated_df = compute_ticker_scores(changed_tickers)
+else:
+    print("✅ No source tables changed. Reusing existing scores.")
+    aggregated_df = None
 
-    if pd.isnull(f_score) or pd.isnull(valuation):
-        return "Unknown"  # Assign "Unknown" if any score is missing
-    elif f_score >= 7 and valuation < 20:
-        return "Strong"
-    elif f_score >= 4 and valuation < 30:
-        return "Medium"
+# Merge recomputed tickers into the existing results
+if existing_results is not None:
+    # Recomputed tickers replace their old rows; ones whose data vanished are dropped
+    kept_results = existing_results[~existing_results["Ticker"].isin(changed_tickers)]
+    if aggregated_df is None:
+        aggregated_df = kept_results
     else:
-        return "Weak"
+        aggregated_df = pd.concat([kept_results, aggregated_df], ignore_index=True)
+
+if aggregated_df is None or aggregated_df.empty:
+    print("Error: No valid financial data found. Check your CSV files.")
+    exit()
+
+if sectors:
+    aggregated_df = aggregated_df.assign(Sector=aggregated_df["Ticker"].map(sectors))
 
-# Apply classification
-aggregated_df["Classification"] = aggregated_df.apply(classify_company, axis=1)
+# Classify the whole universe in one vectorized pass (rank/percentile rules need every ticker)
+classifications = classify_universe(aggregated_df, rule_sets)
+aggregated_df = pd.concat([aggregated_df.reset_index(drop=True), classifications.reset_index(drop=True)], axis=1)
 
 # Save results
-output_file = os.path.join(data_dir, "financial_classification_results.csv")
 aggregated_df.to_csv(output_file, index=False)
+record_stage(data_dir, "stock_picker", {t: input_digests[t] for t in changed_tickers})
 
 print(f"Classification results saved to {output_file}")
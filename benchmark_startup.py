@@ -0,0 +1,118 @@
+import os
+import sys
+import csv
+import json
+import time
+import atexit
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+# CLI Argument Parsing
+parser = argparse.ArgumentParser(description="Startup Benchmark: time each pipeline entry point's --dry-run with python -X importtime")
+parser.add_argument("--tickers", type=str, default="tickers.csv", help="Ticker CSV passed to the entry points (default: tickers.csv)")
+parser.add_argument("--data-dir", type=str, default=None, help="Data directory passed to the entry points (default: a temporary directory)")
+parser.add_argument("--runs", type=int, default=5, help="Runs per entry point; the fastest is recorded (default: 5)")
+parser.add_argument("--history", type=str, default="startup_times.json", help="JSON file the results are appended to (default: startup_times.json, kept out of git since timings are machine-specific)")
+parser.add_argument("--max-regression", type=float, default=None, help="Exit with an error if any entry point is this many percent slower than the previous record")
+args = parser.parse_args()
+
+data_dir = args.data_dir
+if data_dir is None:
+    temp_dir = tempfile.TemporaryDirectory(prefix="startup_benchmark_")
+    atexit.register(temp_dir.cleanup)  # Removed on every exit path, including regressions
+    data_dir = temp_dir.name
+
+with open(args.tickers, mode="r", newline="", encoding="utf-8") as file:
+    ticker_str = ",".join(row["ticker"].strip().upper() for row in csv.DictReader(file) if row.get("ticker"))
+
+# Entry points and the arguments that exercise their --dry-run path
+ENTRY_POINTS = {
+    "finance_analyzer_2.0.py": ["--tickers", args.tickers, "--data-dir", data_dir, "--report-dir", data_dir, "--dry-run"],
+    "Finance_data_scaper_version_3.0.py": ["--tickers", args.tickers, "--data-dir", data_dir, "--dry-run"],
+    "Stock_picker.py": ["--data-dir", data_dir, "--tickers", ticker_str, "--dry-run"],
+    "plot_trends.py": ["--data-dir", data_dir, "--tickers", ticker_str, "--dry-run"],
+    "peer_ranking.py": ["--data-dir", data_dir, "--tickers", ticker_str, "--dry-run"],
+    "financial_panel.py": ["--data-dir", data_dir, "--tickers", ticker_str, "--dry-run"],
+}
+
+def parse_importtime(stderr):
+    """
+    Parses `python -X importtime` output into (total self time in ms, top-level imports by cumulative ms).
+    """
+    total_us = 0
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        if not name[1:].startswith(" "):  # Nested imports are indented under their parent
+            top_level[name.strip()] = int(cumulative_us) / 1000
+
+    return total_us / 1000, top_level
+
+def benchmark(script, script_args):
+    """
+    Runs an entry point several times and returns its fastest wall time, import time and slowest imports.
+    """
+    best = None
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", script] + script_args, capture_output=True, text=True)
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        if result.returncode != 0:
+            print(f"❌ {script} exited with code {result.returncode}:\n{result.stdout}{result.stderr}")
+            return None
+
+        import_ms, top_level = parse_importtime(result.stderr)
+        if best is None or wall_ms < best["wall_ms"]:
+            slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:5]
+            best = {
+                "wall_ms": round(wall_ms, 1),
+                "import_ms": round(import_ms, 1),
+                "slowest_imports": {name: round(ms, 1) for name, ms in slowest},
+            }
+
+    return best
+
+# Load previous records
+history = []
+if os.path.exists(args.history):
+    with open(args.history, mode="r", encoding="utf-8") as file:
+        history = json.load(file)
+previous = history[-1]["results"] if history else {}
+
+results = {}
+regressions = []
+for script, script_args in ENTRY_POINTS.items():
+    result = benchmark(script, script_args)
+    if result is None:
+        exit(1)
+    results[script] = result
+
+    change = ""
+    if script in previous:
+        percent = (result["wall_ms"] - previous[script]["wall_ms"]) / previous[script]["wall_ms"] * 100
+        change = f" ({percent:+.0f}% vs previous)"
+        if args.max_regression is not None and percent > args.max_regression:
+            regressions.append(script)
+
+    print(f"⏱️ {script}: {result['wall_ms']} ms wall, {result['import_ms']} ms importing{change}")
+    print(f"   slowest imports: {', '.join(f'{name} {ms} ms' for name, ms in result['slowest_imports'].items())}")
+
+history.append({
+    "timestamp": datetime.now().isoformat(timespec="seconds"),
+    "python": sys.version.split()[0],
+    "results": results,
+})
+with open(args.history, mode="w", encoding="utf-8") as file:
+    json.dump(history, file, indent=2)
+print(f"💾 Startup times recorded in {args.history}")
+
+if regressions:
+    print(f"❌ Startup regressed by more than {args.max_regression}% for: {', '.join(regressions)}")
+    exit(1)
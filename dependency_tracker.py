@@ -0,0 +1,103 @@
+import os
+import json
+import hashlib
+
+# Manifest stored next to the scraped data: {stage: {ticker: input_digest}}
+MANIFEST_FILE = ".pipeline_manifest.json"
+
+def file_hash(file_path):
+    """
+    Returns the SHA-256 of a file's contents, or None if the file is missing.
+    """
+    if not os.path.exists(file_path):
+        return None
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_inputs(file_paths, extra=None):
+    """
+    Combines the content hashes of all input files (and optional extra data) into one digest.
+    """
+    digest = hashlib.sha256()
+    for file_path in sorted(file_paths):
+        digest.update(os.path.basename(file_path).encode("utf-8"))
+        digest.update((file_hash(file_path) or "missing").encode("utf-8"))
+
+    if extra is not None:
+        digest.update(json.dumps(extra, sort_keys=True, default=str).encode("utf-8"))
+
+    return digest.hexdigest()
+
+def load_manifest(data_dir):
+    """
+    Loads the dependency manifest, returning an empty one if it is missing or unreadable.
+    """
+    manifest_path = os.path.join(data_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+
+    try:
+        with open(manifest_path, mode="r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read dependency manifest ({e}). Recomputing everything.")
+        return {}
+
+def save_manifest(data_dir, manifest):
+    """
+    Writes the dependency manifest atomically so an interrupted run never leaves it half-written.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    manifest_path = os.path.join(data_dir, MANIFEST_FILE)
+    tmp_path = manifest_path + ".tmp"
+
+    with open(tmp_path, mode="w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def find_changed(data_dir, stage, ticker_inputs, ticker_outputs=None, extra=None, force=False, *, version, params=None):
+    """
+    Determines which tickers need recomputing for a pipeline stage.
+
+    ticker_inputs maps each ticker to the source files it is derived from,
+    ticker_outputs (optional) maps each ticker to the artifacts it produces,
+    and extra (optional) maps each ticker to non-file inputs (e.g. sentiment).
+    version is the stage's logic version and params its CLI options; both are
+    part of every digest, so bumping the version (whenever the stage's
+    computation changes) or changing an option invalidates cached results.
+    A ticker is stale if its digest differs from the recorded one or any of
+    its outputs is missing.
+
+    Returns (changed_tickers, digests), where digests must be passed to
+    record_stage once the changed tickers have been recomputed.
+    """
+    recorded = load_manifest(data_dir).get(stage, {})
+    ticker_outputs = ticker_outputs or {}
+    extra = extra or {}
+
+    changed = []
+    digests = {}
+    for ticker, inputs in ticker_inputs.items():
+        salt = {"stage": stage, "version": version, "params": params, "extra": extra.get(ticker)}
+        digests[ticker] = hash_inputs(inputs, salt)
+
+        outputs_missing = any(not os.path.exists(path) for path in ticker_outputs.get(ticker, []))
+        if force or outputs_missing or recorded.get(ticker) != digests[ticker]:
+            changed.append(ticker)
+
+    return changed, digests
+
+def record_stage(data_dir, stage, digests):
+    """
+    Records the input digests of recomputed tickers for a stage, keeping all other entries.
+    """
+    if not digests:
+        return
+
+    manifest = load_manifest(data_dir)
+    manifest.setdefault(stage, {}).update(digests)
+    save_manifest(data_dir, manifest)
@@ -3,35 +3,40 @@ import os
 import argparse
 import subprocess
 import csv
-import pandas as pd
-from senitment_tracker import fetch_yahoo_news, analyze_sentiment
-
+from dependency_tracker import find_changed, record_stage
 
-from report_generator import generate_pdf_report  # New PDF report function
+# Sentiment & report dependencies (pandas, scipy, fpdf, news/NLP libraries) are imported
+# in the stages that use them, so argument/ticker validation and --dry-run start instantly.
 
 # CLI Argument Parsing
 parser = argparse.ArgumentParser(description="Full Financial Analysis Pipeline")
 parser.add_argument("--tickers", type=str, required=True, help="Path to the CSV file with tickers & URLs")
 parser.add_argument("--data-dir", type=str, required=True, help="Path to the output directory for financial data")
 parser.add_argument("--report-dir", type=str, required=True, help="Path to save PDF reports")
+parser.add_argument("--force", action="store_true", help="Recompute every stage for every ticker, even if unchanged")
+parser.add_argument("--periods", type=str, default="annual", help="Comma-separated table views to scrape & analyze: annual, quarterly, ttm (default: annual)")
+parser.add_argument("--dry-run", action="store_true", help="Validate the ticker CSV & options and print the planned stages without running them")
 args = parser.parse_args()
 
-# Run the Web Scraper
-print(f"📡 Running web scraper using ticker CSV: {args.tickers}...")
-scraper_cmd = ["python", "C:/Users/ccape/Downloads/Company_value_pipeline/Finance_data_scaper_version_3.0.py", "--tickers", args.tickers]
-
-result = subprocess.run(scraper_cmd)
+# Annual tables are always analyzed; quarterly / TTM views are added on top
+# (parsed like the scraper's --periods: trimmed, lowercased, blanks ignored)
+periods = [period.strip().lower() for period in args.periods.split(",") if period.strip()]
+extra_periods = [period for period in periods if period != "annual"]
+unknown_periods = [period for period in extra_periods if period not in ("quarterly", "ttm")]
+if unknown_periods:
+    print(f"❌ Unknown period(s): {', '.join(unknown_periods)}. Use annual, quarterly or ttm.")
+    exit(1)
+periods_str = ",".join(["annual"] + extra_periods)
 
-if result.returncode != 0:
-    print("❌ Scraper encountered an error. Exiting pipeline.")
+# Extract tickers from the CSV (validated before any stage runs)
+if not os.path.exists(args.tickers):
+    print(f"❌ Ticker CSV not found: {args.tickers}. Exiting pipeline.")
     exit(1)
-print("✅ Web scraping completed successfully.")
 
-# Extract tickers from the CSV
 tickers = []
 with open(args.tickers, mode="r", newline="", encoding="utf-8") as file:
     reader = csv.DictReader(file)
-    tickers = [row["ticker"].strip().upper() for row in reader if "ticker" in row]
+    tickers = [row["ticker"].strip().upper() for row in reader if row.get("ticker")]
 
 if not tickers:
     print("❌ No valid tickers found in CSV. Exiting pipeline.")
@@ -39,9 +44,35 @@ if not tickers:
 
 ticker_str = ",".join(tickers)
 
+# Stage commands
+force_flag = ["--force"] if args.force else []
+scraper_cmd = ["python", "C:/Users/ccape/Downloads/Company_value_pipeline/Finance_data_scaper_version_3.0.py", "--tickers", args.tickers, "--periods", periods_str]
+stock_picker_cmd = ["python", "stock_picker.py", "--data-dir", args.data_dir, "--tickers", ticker_str, "--sectors", args.tickers] + force_flag
+peer_ranking_cmd = ["python", "peer_ranking.py", "--data-dir", args.data_dir, "--tickers", ticker_str] + force_flag
+panel_cmd = ["python", "financial_panel.py", "--data-dir", args.data_dir, "--tickers", ticker_str, "--periods", periods_str] + force_flag
+plot_cmds = {
+    period: ["python", "plot_trends.py", "--data-dir", args.data_dir, "--tickers", ticker_str, "--period", period] + force_flag
+    for period in ["annual"] + extra_periods
+}
+
+if args.dry_run:
+    print(f"🧪 Dry run: {len(tickers)} valid tickers ({ticker_str}). Planned stages:")
+    for cmd in [scraper_cmd, stock_picker_cmd, peer_ranking_cmd, panel_cmd, *plot_cmds.values()]:
+        print("  " + " ".join(cmd))
+    print(f"  sentiment analysis & PDF reports -> {args.report_dir}")
+    exit()
+
+# Run the Web Scraper
+print(f"📡 Running web scraper using ticker CSV: {args.tickers}...")
+result = subprocess.run(scraper_cmd)
+
+if result.returncode != 0:
+    print("❌ Scraper encountered an error. Exiting pipeline.")
+    exit(1)
+print("✅ Web scraping completed successfully.")
+
 # Run the Stock Picker
 print(f"📊 Running stock picker with tickers: {ticker_str}...")
-stock_picker_cmd = ["python", "stock_picker.py", "--data-dir", args.data_dir, "--tickers", ticker_str]
 result = subprocess.run(stock_picker_cmd)
 
 if result.returncode != 0:
@@ -49,18 +80,38 @@ if result.returncode != 0:
     exit(1)
 print("✅ Stock picker completed successfully.")
 
-# Run the Plot Generator (Trend Analysis)
-print(f"📊 Running trend plots for tickers: {ticker_str}...")
-plot_cmd = ["python", "plot_trends.py", "--data-dir", args.data_dir, "--tickers", ticker_str]
-result = subprocess.run(plot_cmd)
+# Run the Peer Ranking (cross-sectional percentiles & z-scores)
+print(f"📊 Ranking tickers against their peers: {ticker_str}...")
+result = subprocess.run(peer_ranking_cmd)
+
+if result.returncode != 0:
+    print("❌ Peer ranking encountered an error. Exiting pipeline.")
+    exit(1)
+print("✅ Peer ranking completed successfully.")
+
+# Run the Financial Panel (TTM totals, YoY growth & rolling trend slopes)
+print(f"📈 Building time-indexed financial panel ({periods_str}) for tickers: {ticker_str}...")
+result = subprocess.run(panel_cmd)
 
 if result.returncode != 0:
-    print("❌ Plot generator encountered an error. Exiting pipeline.")
+    print("❌ Financial panel encountered an error. Exiting pipeline.")
     exit(1)
+print("✅ Financial panel built successfully.")
+
+# Run the Plot Generator (Trend Analysis)
+for period, plot_cmd in plot_cmds.items():
+    print(f"📊 Running {period} trend plots for tickers: {ticker_str}...")
+    result = subprocess.run(plot_cmd)
+
+    if result.returncode != 0:
+        print("❌ Plot generator encountered an error. Exiting pipeline.")
+        exit(1)
 print("✅ Trend plots generated successfully.")
 
 # Run Sentiment Analysis
 print(f"📰 Fetching news & analyzing sentiment for tickers: {ticker_str}...")
+from senitment_tracker import fetch_yahoo_news, analyze_sentiment
+
 sentiment_data = {}
 
 for ticker in tickers:
@@ -74,8 +125,23 @@ for ticker in tickers:
 print("✅ Sentiment analysis completed.")
 
 # Generate Final PDF Report
-print(f"📄 Generating final financial reports for tickers: {ticker_str}...")
-for ticker in tickers:
+from report_generator import generate_pdf_report, report_input_files, report_output_path, REPORT_VERSION  # New PDF report function
+
+# Only regenerate reports whose trend data or sentiment summary changed
+changed_tickers, input_digests = find_changed(
+    args.data_dir,
+    "report_generator",
+    {ticker: list(report_input_files(ticker, args.data_dir)) for ticker in tickers},
+    {ticker: [report_output_path(ticker, args.report_dir)] for ticker in tickers},
+    extra={ticker: sentiment_data[ticker]["sentiment_summary"] for ticker in tickers},
+    force=args.force,
+    version=REPORT_VERSION,
+)
+
+print(f"📄 Generating final financial reports for tickers: {','.join(changed_tickers) or 'none (all up to date)'}...")
+for ticker in changed_tickers:
     generate_pdf_report(ticker, args.data_dir, args.report_dir, sentiment_data[ticker])
 
+record_stage(args.data_dir, "report_generator", {t: input_digests[t] for t in changed_tickers})
+
 print("\n🎉 Full pipeline executed successfully! Reports saved in:", args.report_dir)
@@ -0,0 +1,301 @@
+import os
+import re
+import argparse
+from peer_ranking import SOURCE_TABLES, to_number
+
+# NumPy & pandas are imported inside the functions that use them so --dry-run stays fast.
+
+# Period views the scraper can capture; annual files keep their original unsuffixed names
+PERIOD_TYPES = ("annual", "quarterly", "ttm")
+
+# Panel logic version, part of the dependency digest: bump whenever derived metrics change
+# 2: YoY growth matched by Period End, so a missing period only blanks its own row
+STAGE_VERSION = 2
+
+# Calendar length of one period; ttm snapshots are reported quarterly
+MONTHS_PER_PERIOD = {"annual": 12, "quarterly": 3, "ttm": 3}
+
+# Slack for 52/53-week fiscal calendars (e.g. Sep 28 vs Sep 30 period ends)
+SPACING_TOLERANCE_DAYS = 10
+
+# ✅ Same metric names as `stock_picker.py` & `plot_trends.py`
+TREND_METRICS = [
+    "Return on Assets (ROA)", "Operating Cash Flow", "Net Income",
+    "Current Ratio", "Debt / Equity Ratio", "Total Common Shares Outstanding",
+    "Gross Margin", "Asset Turnover",
+    "PE Ratio", "PB Ratio", "P/FCF Ratio", "PEG Ratio", "EV/EBITDA Ratio"
+]
+
+# Flow metrics (summed over a period) that TTM totals are computed for
+FLOW_METRICS = [
+    "Revenue", "Gross Profit", "Operating Income", "Net Income",
+    "Operating Cash Flow", "Capital Expenditures", "Free Cash Flow"
+]
+
+QUARTER_LABEL = re.compile(r"Q([1-4])\s+(?:FY\s*)?'?(\d{4}|\d{2})")
+YEAR_LABEL = re.compile(r"(?:FY\s*)?(\d{4})")
+
+def period_file(data_dir, ticker, table, period_type="annual"):
+    """
+    Returns the CSV path of a scraped table for a period type.
+    """
+    suffix = "" if period_type == "annual" else f"_{period_type}"
+    return os.path.join(data_dir, f"{ticker}_{table}{suffix}.csv")
+
+def parse_period_end(label):
+    """
+    Converts a column header ('FY 2024', '2024', 'Q3 2024', 'Sep 28, 2024') to a period end date.
+
+    Fiscal labels without an explicit date are mapped to calendar quarter/year ends,
+    so the scraped 'Period Ending' row is preferred whenever it exists.
+    Labels such as 'Current' or 'TTM' have no fixed date and return NaT.
+    """
+    import pandas as pd
+
+    label = str(label).strip()
+
+    quarter = QUARTER_LABEL.fullmatch(label)
+    if quarter:
+        year = int(quarter.group(2))
+        year = year + 2000 if year < 100 else year
+        return pd.Timestamp(year, 3 * int(quarter.group(1)), 1) + pd.offsets.MonthEnd(0)
+
+    year = YEAR_LABEL.fullmatch(label)
+    if year:
+        return pd.Timestamp(int(year.group(1)), 12, 31)
+
+    return pd.to_datetime(label, errors="coerce")
+
+def load_ticker_panel(data_dir, ticker, period_type="annual"):
+    """
+    Loads all source tables of one ticker and period type, indexed by period end date (oldest first).
+    """
+    import pandas as pd
+
+    tables = []
+    for table in SOURCE_TABLES:
+        file_path = period_file(data_dir, ticker, table, period_type)
+        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            continue
+
+        df = pd.read_csv(file_path, dtype=str)
+        df = df.set_index(df.columns[0])
+
+        # Use the scraped 'Period Ending' row when present, otherwise parse the headers
+        ending_rows = [row for row in df.index if str(row).startswith("Period Ending")]
+        if ending_rows:
+            labels = df.loc[ending_rows[0]].tolist()
+            df = df.drop(index=ending_rows)
+        else:
+            labels = df.columns.tolist()
+
+        df = df.T
+        df.index = pd.DatetimeIndex([parse_period_end(label) for label in labels], name="Period End")
+        df = df[df.index.notna()]
+        df = df[~df.index.duplicated()]
+        tables.append(df)
+
+    if not tables:
+        return None
+
+    panel = pd.concat(tables, axis=1, sort=True)
+    panel = panel.loc[:, ~panel.columns.duplicated()]  # Metric names shared by two tables
+    panel = panel.apply(to_number).sort_index()
+    panel.columns.name = None
+    return panel
+
+def load_panel(data_dir, tickers, period_types=("annual",)):
+    """
+    Builds the time-indexed panel for all tickers, indexed by (Ticker, Period Type, Period End).
+    """
+    import pandas as pd
+
+    frames = []
+    for ticker in tickers:
+        for period_type in period_types:
+            ticker_panel = load_ticker_panel(data_dir, ticker, period_type)
+            if ticker_panel is None:
+                print(f"⚠️ No {period_type} tables found for {ticker}. Skipping...")
+                continue
+
+            frames.append(pd.concat({(ticker, period_type): ticker_panel}, names=["Ticker", "Period Type"]))
+
+    if not frames:
+        return None
+
+    return pd.concat(frames).sort_index()
+
+def position_in_series(panel):
+    """
+    Returns each row's 0-based position within its (Ticker, Period Type) series.
+    """
+    return panel.groupby(level=["Ticker", "Period Type"], sort=False).cumcount().to_numpy()
+
+def lag_is_exact(index, lag):
+    """
+    True where the row `lag` positions back in the same (Ticker, Period Type) series ended
+    exactly `lag` periods earlier, i.e. no period is missing in between.
+    """
+    frame = index.to_frame(index=False)
+    ends = frame["Period End"]
+    previous = ends.groupby([frame["Ticker"], frame["Period Type"]], sort=False).shift(lag)
+    expected_days = frame["Period Type"].map(MONTHS_PER_PERIOD) * lag * 365.25 / 12
+    gap_days = (ends - previous).dt.days
+    return ((gap_days - expected_days).abs() <= SPACING_TOLERANCE_DAYS).to_numpy()
+
+def ttm_sum(panel, metrics, quarters=4):
+    """
+    Trailing-twelve-month totals from quarterly rows: one rolling sum over the whole panel,
+    masking windows that span two tickers or skip a missing quarter.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if "quarterly" not in panel.index.get_level_values("Period Type"):
+        return pd.DataFrame(index=panel.index[:0], columns=metrics, dtype=float)
+
+    quarterly = panel.xs("quarterly", level="Period Type", drop_level=False)[metrics]
+    sums = quarterly.rolling(quarters, min_periods=quarters).sum()
+    sums.loc[~lag_is_exact(quarterly.index, quarters - 1)] = np.nan
+    return sums
+
+def yoy_growth(panel, metrics):
+    """
+    Year-over-year growth for every row, compared with the same series' period ending about
+    12 months earlier (within SPACING_TOLERANCE_DAYS). Matching by Period End rather than by
+    position keeps one missing period from blanking the growth of the periods after it;
+    rows with no period a year back get NaN.
+    """
+    import numpy as np
+    import pandas as pd
+
+    keys = ["Ticker", "Period Type"]
+    current = panel[metrics].reset_index()
+    current["Row"] = np.arange(len(current))
+    current["Year Earlier"] = current["Period End"] - pd.DateOffset(years=1)
+
+    previous = pd.merge_asof(
+        current[keys + ["Row", "Year Earlier"]].sort_values("Year Earlier"),
+        current[keys + ["Period End"] + metrics].sort_values("Period End"),
+        left_on="Year Earlier",
+        right_on="Period End",
+        by=keys,
+        direction="nearest",
+        tolerance=pd.Timedelta(days=SPACING_TOLERANCE_DAYS),
+    ).sort_values("Row")
+
+    previous_values = previous[metrics].to_numpy(dtype=float)
+    current_values = current[metrics].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = (current_values - previous_values) / np.abs(previous_values)
+
+    growth = pd.DataFrame(growth, index=panel.index, columns=metrics)
+    return growth.replace([np.inf, -np.inf], np.nan)
+
+def rolling_slope(panel, metrics, window=4):
+    """
+    Least-squares trend slope (change per period) over a rolling window, for every metric at once.
+
+    Uses rolling sums of x, y, xy and x^2 instead of fitting one regression per
+    window, so the cost grows linearly with the number of rows. Windows that span two
+    series or skip a missing period get NaN.
+    """
+    import numpy as np
+    import pandas as pd
+
+    values = panel[metrics]
+    position = position_in_series(panel)
+    x = pd.Series(position, index=values.index, dtype=float)
+
+    sum_x = x.rolling(window).sum()
+    sum_xx = (x * x).rolling(window).sum()
+    sum_y = values.rolling(window, min_periods=window).sum()
+    sum_xy = values.mul(x, axis=0).rolling(window, min_periods=window).sum()
+
+    denominator = window * sum_xx - sum_x ** 2
+    slopes = (window * sum_xy).sub(sum_y.mul(sum_x, axis=0)).div(denominator, axis=0)
+    slopes.loc[~lag_is_exact(values.index, window - 1)] = np.nan
+    return slopes
+
+def derived_metrics(panel, metrics, window=4):
+    """
+    Adds TTM totals, YoY growth and rolling trend slopes next to the raw metrics.
+    """
+    metrics = [metric for metric in metrics if metric in panel.columns]
+    flow_metrics = [metric for metric in FLOW_METRICS if metric in panel.columns]
+
+    result = panel[metrics].copy()
+    result = result.join(yoy_growth(panel, metrics).add_suffix(" YoY"))
+    result = result.join(rolling_slope(panel, metrics, window).add_suffix(" Slope"))
+
+    if flow_metrics:
+        result = result.join(ttm_sum(panel, flow_metrics).add_suffix(" TTM"))
+
+    return result
+
+if __name__ == "__main__":
+    from dependency_tracker import find_changed, record_stage
+
+    # CLI Argument Parsing
+    parser = argparse.ArgumentParser(description="Financial Panel: TTM totals, YoY growth & rolling trend slopes")
+    parser.add_argument("--data-dir", type=str, required=True, help="Path to the scraped financial data directory")
+    parser.add_argument("--tickers", type=str, required=True, help="Comma-separated tickers to include")
+    parser.add_argument("--periods", type=str, default="annual", help="Comma-separated period types: annual, quarterly, ttm (default: annual)")
+    parser.add_argument("--window", type=int, default=4, help="Number of periods in the rolling trend window (default: 4)")
+    parser.add_argument("--force", action="store_true", help="Rebuild the panel even if no source table changed")
+    parser.add_argument("--dry-run", action="store_true", help="Validate inputs and report whether the panel would be rebuilt, without loading pandas or writing results")
+    args = parser.parse_args()
+
+    tickers = args.tickers.split(",")
+    period_types = [period.strip().lower() for period in args.periods.split(",") if period.strip()]  # Same parsing as the scraper
+    unknown = [period for period in period_types if period not in PERIOD_TYPES]
+    if unknown:
+        print(f"❌ Unknown period type(s): {unknown}. Use {list(PERIOD_TYPES)}.")
+        exit(1)
+
+    output_file = os.path.join(args.data_dir, "financial_panel.csv")
+
+    changed_tickers, input_digests = find_changed(
+        args.data_dir,
+        "financial_panel",
+        {
+            ticker: [period_file(args.data_dir, ticker, table, period) for table in SOURCE_TABLES for period in period_types]
+            for ticker in tickers
+        },
+        {ticker: [output_file] for ticker in tickers},
+        force=args.force,
+        version=STAGE_VERSION,
+        params={"universe": sorted(tickers), "periods": period_types, "window": args.window},
+    )
+
+    # Dry run: validation only, exits before NumPy/pandas are imported
+    if args.dry_run:
+        if not os.path.isdir(args.data_dir):
+            print(f"❌ Data directory not found: {args.data_dir}")
+            exit(1)
+
+        for ticker in tickers:
+            for period_type in period_types:
+                if not any(os.path.exists(period_file(args.data_dir, ticker, table, period_type)) for table in SOURCE_TABLES):
+                    print(f"⚠️ {ticker}: no {period_type} tables found")
+
+        if changed_tickers:
+            print(f"🔁 Would rebuild the financial panel for {len(tickers)} tickers (changed: {','.join(changed_tickers)})")
+        else:
+            print(f"✅ Financial panel is up to date: {output_file}")
+        exit()
+
+    if not changed_tickers:
+        print(f"✅ No source tables changed. Financial panel is up to date: {output_file}")
+        exit()
+
+    panel = load_panel(args.data_dir, tickers, period_types)
+    if panel is None:
+        print("❌ No valid financial data found. Check your CSV files.")
+        exit(1)
+
+    metrics = TREND_METRICS + [metric for metric in FLOW_METRICS if metric not in TREND_METRICS]
+    result = derived_metrics(panel, metrics, args.window)
+    result.to_csv(output_file)
+    record_stage(args.data_dir, "financial_panel", input_digests)
+    print(f"💾 Saved financial panel ({len(result)} periods, {len(result.columns)} columns): {output_file}")
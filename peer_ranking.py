@@ -0,0 +1,225 @@
+import os
+import argparse
+
+# NumPy & pandas are imported inside the functions that use them so --dry-run
+# (and modules importing SOURCE_TABLES) don't pay their import cost.
+
+# Source tables ranked across the universe (same files Stock Picker reads)
+SOURCE_TABLES = ["ratios", "income_statement", "balance_sheet", "cash_flow"]
+
+# Ranking logic version, part of the dependency digest: bump whenever the standings change
+STAGE_VERSION = 1
+
+STANDING_COLUMNS = ["Ticker", "Fiscal Year", "Metric", "Value", "Rank", "Peers", "Percentile", "Z_Score"]
+
+def to_number(series):
+    """
+    Converts scraped values like '1,234', '12.5%' or '-' to floats (NaN if not numeric).
+    """
+    import pandas as pd
+
+    cleaned = series.astype(str).str.replace(",", "", regex=False).str.replace("%", "", regex=False)
+    return pd.to_numeric(cleaned, errors="coerce")
+
+def load_metric_panel(data_dir, tickers):
+    """
+    Loads every source table for each ticker into one panel: one row per (Ticker, Fiscal Year), one column per metric.
+    """
+    import pandas as pd
+
+    ticker_frames = []
+    for ticker in tickers:
+        tables = []
+        for table in SOURCE_TABLES:
+            file_path = os.path.join(data_dir, f"{ticker}_{table}.csv")
+            if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+                continue
+
+            df = pd.read_csv(file_path, dtype=str)
+            df = df.set_index(df.columns[0]).T  # Rows = fiscal years, columns = metrics
+            tables.append(df)
+
+        if not tables:
+            print(f"⚠️ No financial tables found for {ticker}. Skipping...")
+            continue
+
+        ticker_df = pd.concat(tables, axis=1)
+        ticker_df = ticker_df.loc[:, ~ticker_df.columns.duplicated()]  # Metric names shared by two tables
+        ticker_df = ticker_df.apply(to_number)
+        ticker_df = ticker_df.rename_axis("Fiscal Year").reset_index()
+        ticker_df.insert(0, "Ticker", ticker)
+        ticker_frames.append(ticker_df)
+
+    if not ticker_frames:
+        return None
+
+    return pd.concat(ticker_frames, ignore_index=True)
+
+def compute_standings(panel):
+    """
+    Computes every ticker's rank, percentile and z-score per (fiscal year, metric).
+
+    Each metric is sorted once per fiscal year (O(n log n)) and every ticker's
+    position is found by binary search. Percentile is the share of peers with a
+    value <= the ticker's, and rank 1 is the highest value.
+    """
+    import numpy as np
+    import pandas as pd
+
+    metrics = [col for col in panel.columns if col not in ("Ticker", "Fiscal Year")]
+    standings = []
+
+    for fiscal_year, year_df in panel.groupby("Fiscal Year", sort=False):
+        tickers = year_df["Ticker"].to_numpy()
+
+        for metric in metrics:
+            values = year_df[metric].to_numpy(dtype=float)
+            valid = ~np.isnan(values)
+            if not valid.any():
+                continue
+
+            metric_values = values[valid]
+            metric_tickers = tickers[valid]
+            sorted_values = np.sort(metric_values)
+
+            peer_count = len(sorted_values)
+            at_or_below = np.searchsorted(sorted_values, metric_values, side="right")
+            std = metric_values.std()
+
+            standings.append(pd.DataFrame({
+                "Ticker": metric_tickers,
+                "Fiscal Year": fiscal_year,
+                "Metric": metric,
+                "Value": metric_values,
+                "Rank": peer_count - at_or_below + 1,
+                "Peers": peer_count,
+                "Percentile": at_or_below / peer_count * 100,
+                "Z_Score": (metric_values - metric_values.mean()) / std if std > 0 else 0.0,
+            }))
+
+    if not standings:
+        return pd.DataFrame(columns=STANDING_COLUMNS)
+    return pd.concat(standings, ignore_index=True)
+
+def build_peer_index(standings):
+    """
+    Builds the lookup structures over a standings table (fresh or loaded from peer_rankings.csv).
+
+    Returns a dict with:
+      "years":     fiscal years in the order they appear in the data (most recent first when scraped)
+      "sorted":    {(fiscal_year, metric): (values ascending, tickers in the same order)} for top-k queries
+      "standings": standings indexed and sorted by (Ticker, Fiscal Year) for O(log n) lookups
+    """
+    sorted_index = {}
+    ordered = standings.sort_values(["Fiscal Year", "Metric", "Value"], kind="stable")
+    for (fiscal_year, metric), group in ordered.groupby(["Fiscal Year", "Metric"], sort=False):
+        sorted_index[(fiscal_year, metric)] = (group["Value"].to_numpy(dtype=float), group["Ticker"].to_numpy())
+
+    return {
+        "years": standings["Fiscal Year"].unique().tolist(),
+        "sorted": sorted_index,
+        "standings": standings.set_index(["Ticker", "Fiscal Year"]).sort_index(),
+    }
+
+def peer_standing(index, ticker, fiscal_year):
+    """
+    Returns a ticker's rank, percentile and z-score for every metric in a fiscal year.
+    """
+    standings = index["standings"]
+    if (ticker, fiscal_year) not in standings.index:
+        return None
+    return standings.loc[[(ticker, fiscal_year)]].reset_index()
+
+def top_k(index, metric, fiscal_year, k=10, ascending=False):
+    """
+    Returns the k tickers with the highest (or lowest if ascending) value of a metric as (ticker, value) pairs.
+    """
+    entry = index["sorted"].get((fiscal_year, metric))
+    if entry is None:
+        return []
+
+    sorted_values, sorted_tickers = entry
+    if not ascending:
+        sorted_values, sorted_tickers = sorted_values[::-1], sorted_tickers[::-1]
+    return list(zip(sorted_tickers[:k].tolist(), sorted_values[:k].tolist()))
+
+if __name__ == "__main__":
+    from dependency_tracker import find_changed, record_stage
+
+    # CLI Argument Parsing
+    parser = argparse.ArgumentParser(description="Peer Ranking: Cross-sectional percentile ranks & z-scores per fiscal year")
+    parser.add_argument("--data-dir", type=str, required=True, help="Path to the scraped financial data directory")
+    parser.add_argument("--tickers", type=str, required=True, help="Comma-separated tickers forming the peer universe")
+    parser.add_argument("--ticker", type=str, default=None, help="Print this ticker's peer standing")
+    parser.add_argument("--metric", type=str, default=None, help="Print the top-k tickers for this metric")
+    parser.add_argument("--top-k", type=int, default=10, help="Number of tickers to print with --metric (default: 10)")
+    parser.add_argument("--year", type=str, default=None, help="Fiscal year column to query (default: first column in the data)")
+    parser.add_argument("--force", action="store_true", help="Rebuild the rankings even if no source table changed")
+    parser.add_argument("--dry-run", action="store_true", help="Validate inputs and report whether the rankings would be rebuilt, without loading pandas or writing results")
+    args = parser.parse_args()
+
+    tickers = args.tickers.split(",")
+    output_file = os.path.join(args.data_dir, "peer_rankings.csv")
+
+    # Rankings are universe-wide, so any changed ticker invalidates the whole output
+    changed_tickers, input_digests = find_changed(
+        args.data_dir,
+        "peer_ranking",
+        {ticker: [os.path.join(args.data_dir, f"{ticker}_{table}.csv") for table in SOURCE_TABLES] for ticker in tickers},
+        {ticker: [output_file] for ticker in tickers},
+        force=args.force,
+        version=STAGE_VERSION,
+        params={"universe": sorted(tickers)},  # Adding/removing a peer changes everyone's rank
+    )
+
+    # Dry run: validation only, exits before NumPy/pandas are imported
+    if args.dry_run:
+        if not os.path.isdir(args.data_dir):
+            print(f"❌ Data directory not found: {args.data_dir}")
+            exit(1)
+
+        for ticker in tickers:
+            missing = [table for table in SOURCE_TABLES if not os.path.exists(os.path.join(args.data_dir, f"{ticker}_{table}.csv"))]
+            if missing:
+                print(f"⚠️ {ticker}: missing {len(missing)} source table(s): {', '.join(missing)}")
+
+        if changed_tickers:
+            print(f"🔁 Would rebuild peer rankings for {len(tickers)} tickers (changed: {','.join(changed_tickers)})")
+        else:
+            print(f"✅ Peer rankings are up to date: {output_file}")
+        exit()
+
+    if changed_tickers:
+        panel = load_metric_panel(args.data_dir, tickers)
+        if panel is None:
+            print("❌ No valid financial data found. Check your CSV files.")
+            exit(1)
+
+        standings = compute_standings(panel)
+        standings.to_csv(output_file, index=False)
+        record_stage(args.data_dir, "peer_ranking", input_digests)
+        print(f"💾 Saved peer rankings for {len(tickers)} tickers: {output_file}")
+    else:
+        print(f"✅ No source tables changed. Loading peer rankings from {output_file}")
+        import pandas as pd
+        standings = pd.read_csv(output_file, dtype={"Ticker": str, "Fiscal Year": str})
+
+    index = build_peer_index(standings)
+    if not index["years"]:
+        print("⚠️ No numeric metrics to rank.")
+        exit()
+
+    year = args.year if args.year is not None else index["years"][0]
+
+    if args.ticker:
+        standing = peer_standing(index, args.ticker.upper(), year)
+        if standing is None:
+            print(f"⚠️ No data for {args.ticker} in {year}.")
+        else:
+            print(f"📊 Peer standing for {args.ticker.upper()} ({year}):\n{standing.to_string(index=False)}")
+
+    if args.metric:
+        leaders = top_k(index, args.metric, year, args.top_k)
+        print(f"🏆 Top {args.top_k} for {args.metric} ({year}):")
+        for position, (ticker, value) in enumerate(leaders, start=1):
+            print(f"  {position}. {ticker}: {value}")
@@ -1,22 +1,27 @@
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
 import argparse
+from dependency_tracker import find_changed, record_stage
+from trend_files import TREND_DATA_DIR, trend_data_path
 
 # CLI Argument Parsing
 parser = argparse.ArgumentParser(description="Plot F-Score & Valuation Trends")
 parser.add_argument("--data-dir", type=str, required=True, help="Path to the scraped financial data directory")
 parser.add_argument("--tickers", type=str, required=True, help="Comma-separated tickers to analyze")
+parser.add_argument("--force", action="store_true", help="Regenerate trends for every ticker, even if unchanged")
+parser.add_argument("--period", type=str, default="annual", choices=["annual", "quarterly", "ttm"], help="Table view to plot (default: annual)")
+parser.add_argument("--dry-run", action="store_true", help="Validate inputs and list the tickers that would be re-plotted, without writing anything")
 args = parser.parse_args()
 
+# Trend extraction logic version, part of the dependency digest: bump whenever outputs change
+STAGE_VERSION = 1
+
+# Non-annual tables & trend outputs carry a _<period> suffix so annual results are left untouched
+period_suffix = "" if args.period == "annual" else f"_{args.period}"
+
 # Create directories for saving plots & CSV data
 f_score_plot_dir = os.path.join(args.data_dir, "f_score_trends")
 valuation_plot_dir = os.path.join(args.data_dir, "valuation_trends")
-trend_data_dir = os.path.join(args.data_dir, "trend_data")  # New directory for trend CSVs
-
-os.makedirs(f_score_plot_dir, exist_ok=True)
-os.makedirs(valuation_plot_dir, exist_ok=True)
-os.makedirs(trend_data_dir, exist_ok=True)
+trend_data_dir = os.path.join(args.data_dir, TREND_DATA_DIR)  # New directory for trend CSVs
 
 # ✅ Use the exact column names from `stock_picker.py`
 F_SCORE_METRICS = [
@@ -31,7 +36,9 @@ def load_and_transform_data(ticker, metric_list, metric_type):
     """
     Loads financial data and extracts yearly data for the given metrics.
     """
-    file_path = f"{args.data_dir}/{ticker}_ratios.csv"
+    import pandas as pd  # Imported lazily: unchanged tickers & --dry-run never need it
+
+    file_path = f"{args.data_dir}/{ticker}_ratios{period_suffix}.csv"
 
     if not os.path.exists(file_path):
         print(f"❌ Missing data file: {file_path}. Skipping {ticker}.")
@@ -64,7 +71,7 @@ def save_trend_data(ticker, metric_type, data):
     if data is None:
         return
 
-    save_path = os.path.join(trend_data_dir, f"{ticker}_{metric_type}_trend.csv")
+    save_path = trend_data_path(args.data_dir, ticker, metric_type, args.period)
     data.to_csv(save_path, index=True)  # Index = Years
     print(f"💾 Saved {metric_type} trend data: {save_path}")
 
@@ -75,28 +82,69 @@ def plot_trend(data, ticker, metric_type, save_dir):
     if data is None:
         return
 
+    import matplotlib.pyplot as plt  # Imported lazily: the slowest import of this script
+
     plt.figure(figsize=(10, 6))
     
     for column in data.columns:
         plt.scatter(data.index, data[column], label=column, alpha=0.7)
         plt.plot(data.index, data[column], marker="o", linestyle="-")
 
-    plt.xlabel("Year")
+    plt.xlabel("Year" if args.period == "annual" else "Period")
     plt.ylabel(f"{metric_type} Score")
-    plt.title(f"{metric_type} Trends for {ticker}")
+    plt.title(f"{metric_type} Trends for {ticker}" + ("" if args.period == "annual" else f" ({args.period})"))
     plt.legend()
     plt.xticks(rotation=45)
     plt.grid()
 
-    save_path = os.path.join(save_dir, f"{ticker}.png")
+    save_path = os.path.join(save_dir, f"{ticker}{period_suffix}.png")
     plt.savefig(save_path, bbox_inches="tight")
     plt.close()
     print(f"📊 Saved plot: {save_path}")
 
+def trend_outputs(ticker):
+    """
+    Returns the trend CSVs and plots generated for a ticker.
+    """
+    return [
+        trend_data_path(args.data_dir, ticker, "F1_Score", args.period),
+        trend_data_path(args.data_dir, ticker, "Valuation", args.period),
+        os.path.join(f_score_plot_dir, f"{ticker}{period_suffix}.png"),
+        os.path.join(valuation_plot_dir, f"{ticker}{period_suffix}.png"),
+    ]
+
 # Process each ticker
 tickers = args.tickers.split(",")
 
+# Skip tickers whose ratios table is unchanged and whose trend outputs already exist
+changed_tickers, input_digests = find_changed(
+    args.data_dir,
+    "plot_trends" + period_suffix,
+    {ticker: [f"{args.data_dir}/{ticker}_ratios{period_suffix}.csv"] for ticker in tickers},
+    {ticker: trend_outputs(ticker) for ticker in tickers},
+    force=args.force,
+    version=STAGE_VERSION,
+    params={"period": args.period},
+)
+
+# Dry run: validation only, nothing is written
+if args.dry_run:
+    for ticker in tickers:
+        ratios_path = f"{args.data_dir}/{ticker}_ratios{period_suffix}.csv"
+        if not os.path.exists(ratios_path):
+            print(f"⚠️ {ticker}: missing {ratios_path}")
+    print(f"🔁 Would re-plot {len(changed_tickers)} of {len(tickers)} tickers: {','.join(changed_tickers) or 'none'}")
+    exit()
+
+os.makedirs(f_score_plot_dir, exist_ok=True)
+os.makedirs(valuation_plot_dir, exist_ok=True)
+os.makedirs(trend_data_dir, exist_ok=True)
+
 for ticker in tickers:
+    if ticker not in changed_tickers:
+        print(f"⏭️ {ticker} ratios unchanged. Keeping existing trend data & plots.")
+        continue
+
     print(f"📈 Processing {ticker} for F-Score & Valuation trends...")
 
     # Load, save, and plot F-Score trends
@@ -109,4 +157,6 @@ for ticker in tickers:
     save_trend_data(ticker, "Valuation", valuation_data)  # Save for report generation
     plot_trend(valuation_data, ticker, "Valuation", valuation_plot_dir)
 
+record_stage(args.data_dir, "plot_trends" + period_suffix, {t: input_digests[t] for t in changed_tickers})
+
 print("✅ Trend plotting completed!")
@@ -1,8 +1,11 @@
-from fpdf import FPDF
 import os
 import pandas as pd
 import numpy as np
-from scipy.stats import linregress  # For trend analysis
+from trend_files import trend_data_path
+
+# Report logic version, part of the dependency digest: bump whenever report content changes
+# 2: reads the trend CSVs plot_trends actually writes (previous names never matched)
+REPORT_VERSION = 2
 
 def analyze_trend_with_regression(trend_data):
     """
@@ -11,6 +14,8 @@ def analyze_trend_with_regression(trend_data):
     if len(trend_data) < 2:
         return None  # Return None instead of a string
 
+    from scipy.stats import linregress  # For trend analysis (imported lazily: scipy is slow to load)
+
     x = np.arange(len(trend_data))  # Time points (0, 1, 2, ..., n)
     y = np.array(trend_data)  # Actual data points
 
@@ -93,16 +98,27 @@ def compute_f1_score(df):
         f1_scores.append(f1)  # Store F1 score for this row
 
     return f1_scores
+
+def report_input_files(ticker, data_dir):
+    """
+    Returns the (valuation, F1 Score) trend CSV paths a ticker's report is built from.
+    """
+    valuation_path = trend_data_path(data_dir, ticker, "Valuation")
+    f1_score_path = trend_data_path(data_dir, ticker, "F1_Score")
+    return valuation_path, f1_score_path
+
+def report_output_path(ticker, report_dir):
+    """
+    Returns the path of a ticker's generated PDF report.
+    """
+    return os.path.join(report_dir, f"{ticker}_financial_report.pdf")
+
 def generate_pdf_report(ticker, data_dir, report_dir, sentiment_data):
     """
     Generate a financial report PDF summarizing stock classification, trends, and sentiment.
     """
-    # Ensure we look in the correct trend data directory
-    trend_data_dir = os.path.join(data_dir, "trend_data")
-    
     # ✅ Define paths correctly
-    valuation_path = os.path.join(trend_data_dir, f"{ticker}_valuation_trend.csv")
-    f1_score_path = os.path.join(trend_data_dir, f"{ticker}_f1_trend.csv")
+    valuation_path, f1_score_path = report_input_files(ticker, data_dir)
 
     # 📄 DEBUGGING: Print paths to check if they exist
     print(f"🔍 Checking valuation trend file: {valuation_path}")
@@ -174,6 +190,7 @@ def generate_pdf_report(ticker, data_dir, report_dir, sentiment_data):
     recommendation = score_interpretation.get(score, "Unknown")
 
     # Create PDF Report
+    from fpdf import FPDF  # Imported lazily so importing this module doesn't require fpdf
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
@@ -205,7 +222,7 @@ def generate_pdf_report(ticker, data_dir, report_dir, sentiment_data):
 
     # Save PDF
     os.makedirs(report_dir, exist_ok=True)
-    pdf_path = os.path.join(report_dir, f"{ticker}_financial_report.pdf")
+    pdf_path = report_output_path(ticker, report_dir)
     pdf.output(pdf_path)
 
     print(f"✅ PDF Report Generated: {pdf_path}")
@@ -0,0 +1,202 @@
+import json
+import operator
+
+# NumPy & pandas are imported inside the evaluation functions so rule files can be
+# validated (e.g. by `stock_picker.py --dry-run`) without paying their import cost.
+
+# Supported comparison operators for rule conditions (element-wise on NumPy arrays)
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# How a metric is turned into the value a condition compares against
+TRANSFORMS = ("value", "rank", "percentile")
+
+# Default rule set reproducing the original Stock Picker thresholds
+DEFAULT_RULE_SETS = {
+    "Classification": {
+        "default": "Weak",
+        "missing": "Unknown",
+        "rules": [
+            {
+                "label": "Strong",
+                "conditions": [
+                    {"metric": "Piotroski_F", "op": ">=", "value": 7},
+                    {"metric": "Stock_Valuation", "op": "<", "value": 20},
+                ],
+            },
+            {
+                "label": "Medium",
+                "conditions": [
+                    {"metric": "Piotroski_F", "op": ">=", "value": 4},
+                    {"metric": "Stock_Valuation", "op": "<", "value": 30},
+                ],
+            },
+        ],
+    }
+}
+
+def validate_rule_sets(rule_sets):
+    """
+    Checks rule sets for malformed structure, wrongly typed fields, unknown operators/transforms
+    and non-numeric thresholds before anything is evaluated. Raises ValueError naming the rule set and rule.
+    """
+    if not isinstance(rule_sets, dict) or not rule_sets:
+        raise ValueError("Rule file must map at least one rule set name to its definition.")
+
+    for name, rule_set in rule_sets.items():
+        if not isinstance(rule_set, dict):
+            raise ValueError(f"Rule set '{name}' must be an object with a 'rules' list.")
+
+        rules = rule_set.get("rules", [])
+        if not isinstance(rules, list):
+            raise ValueError(f"Rule set '{name}': 'rules' must be a list.")
+
+        for field in ("default", "missing"):
+            if field in rule_set and not isinstance(rule_set[field], str):
+                raise ValueError(f"Rule set '{name}': '{field}' label must be a string.")
+
+        requires = rule_set.get("requires", [])
+        if not isinstance(requires, list) or not all(isinstance(metric, str) for metric in requires):
+            raise ValueError(f"Rule set '{name}': 'requires' must be a list of metric names.")
+
+        for position, rule in enumerate(rules, start=1):
+            if not isinstance(rule, dict) or not isinstance(rule.get("label"), str):
+                raise ValueError(f"Rule set '{name}', rule #{position}: every rule must be an object with a string 'label'.")
+
+            where = f"Rule set '{name}', rule '{rule['label']}'"
+            conditions = rule.get("conditions", [])
+            if not isinstance(conditions, list):
+                raise ValueError(f"{where}: 'conditions' must be a list.")
+
+            for condition in conditions:
+                if not isinstance(condition, dict):
+                    raise ValueError(f"{where}: every condition must be an object.")
+                for field in ("metric", "op", "value"):
+                    if field not in condition:
+                        raise ValueError(f"{where}: condition is missing '{field}'.")
+                for field in ("metric", "op", "transform", "by"):
+                    if field in condition and not isinstance(condition[field], str):
+                        raise ValueError(f"{where}: '{field}' {condition[field]!r} must be a string.")
+                if "ascending" in condition and not isinstance(condition["ascending"], bool):
+                    raise ValueError(f"{where}: 'ascending' {condition['ascending']!r} must be true or false.")
+                if condition["op"] not in OPERATORS:
+                    raise ValueError(f"{where}: unknown operator '{condition['op']}'. Use one of {list(OPERATORS)}.")
+                if condition.get("transform", "value") not in TRANSFORMS:
+                    raise ValueError(f"{where}: unknown transform '{condition['transform']}'. Use one of {list(TRANSFORMS)}.")
+                if isinstance(condition["value"], bool) or not isinstance(condition["value"], (int, float)):
+                    raise ValueError(f"{where}: value {condition['value']!r} for '{condition['metric']}' must be a number.")
+
+    return rule_sets
+
+def load_rule_sets(rules_file=None):
+    """
+    Loads named rule sets from a JSON file, falling back to the default classification rules.
+    """
+    if rules_file is None:
+        return DEFAULT_RULE_SETS
+
+    with open(rules_file, mode="r", encoding="utf-8") as file:
+        rule_sets = json.load(file)
+
+    return validate_rule_sets(rule_sets)
+
+def condition_values(df, condition, cache):
+    """
+    Returns the NumPy array a condition compares against, computed once per (metric, transform, group).
+
+    transform "value" uses the raw metric, "rank" the 1-based rank (1 = smallest unless
+    ascending is false) and "percentile" the percentile rank in (0, 100]. Ranks and
+    percentiles are computed within each group of the optional "by" column (e.g. Sector).
+    """
+    import numpy as np
+    import pandas as pd
+
+    metric = condition["metric"]
+    transform = condition.get("transform", "value")
+    by = condition.get("by")
+    ascending = condition.get("ascending", True)
+
+    key = (metric, transform, by, ascending)
+    if key in cache:
+        return cache[key]
+
+    if metric not in df.columns:
+        print(f"⚠️ Metric '{metric}' not found in results. Conditions on it will never match.")
+        values = np.full(len(df), np.nan)
+    else:
+        series = pd.to_numeric(df[metric], errors="coerce")
+
+        if transform != "value":
+            if by is not None and by in df.columns:
+                series = series.groupby(df[by], dropna=False)
+            elif by is not None:
+                print(f"⚠️ Group column '{by}' not found. Ranking '{metric}' across the whole universe.")
+
+            if transform == "rank":
+                series = series.rank(method="min", ascending=ascending)
+            else:
+                series = series.rank(pct=True, ascending=ascending) * 100
+
+        values = series.to_numpy(dtype=float)
+
+    cache[key] = values
+    return values
+
+def evaluate_rule_set(df, rule_set, cache=None):
+    """
+    Labels every row of df with a single rule set. Rules are checked in order and the first match wins.
+    """
+    import numpy as np
+    import pandas as pd
+
+    cache = {} if cache is None else cache
+    row_count = len(df)
+
+    masks = []
+    referenced_metrics = set()
+    for rule in rule_set.get("rules", []):
+        mask = np.ones(row_count, dtype=bool)
+        for condition in rule.get("conditions", []):
+            referenced_metrics.add(condition["metric"])
+            values = condition_values(df, condition, cache)
+            with np.errstate(invalid="ignore"):
+                mask &= OPERATORS[condition["op"]](values, condition["value"])
+        masks.append((rule["label"], mask))
+
+    labels = np.full(row_count, rule_set.get("default", "Unclassified"), dtype=object)
+
+    # Assign in reverse so earlier rules overwrite later ones (first match wins)
+    for label, mask in reversed(masks):
+        labels[mask] = label
+
+    # Rows missing any metric the rules depend on get the "missing" label
+    required = rule_set.get("requires", sorted(referenced_metrics))
+    if required:
+        missing = np.zeros(row_count, dtype=bool)
+        for metric in required:
+            if metric in df.columns:
+                missing |= pd.to_numeric(df[metric], errors="coerce").isna().to_numpy()
+            else:
+                missing[:] = True
+        labels[missing] = rule_set.get("missing", "Unknown")
+
+    return labels
+
+def classify_universe(df, rule_sets):
+    """
+    Evaluates every named rule set over the whole universe and returns the labels side by side.
+    """
+    import pandas as pd
+
+    cache = {}  # Shared so ranks/percentiles used by several rule sets are computed once
+    classifications = {
+        name: evaluate_rule_set(df, rule_set, cache)
+        for name, rule_set in rule_sets.items()
+    }
+    return pd.DataFrame(classifications, index=df.index)
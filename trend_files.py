@@ -0,0 +1,15 @@
+import os
+
+# Trend CSVs written by `plot_trends.py` and read back by `report_generator.py`.
+# Both build their paths here so the report's dependency digest tracks the real files.
+TREND_DATA_DIR = "trend_data"
+
+# Metric types plot_trends saves trend data for
+TREND_METRIC_TYPES = ("F1_Score", "Valuation")
+
+def trend_data_path(data_dir, ticker, metric_type, period="annual"):
+    """
+    Returns the trend CSV path for a ticker's metric type (non-annual views get a _<period> suffix).
+    """
+    suffix = "" if period == "annual" else f"_{period}"
+    return os.path.join(data_dir, TREND_DATA_DIR, f"{ticker}_{metric_type}{suffix}_trend.csv")